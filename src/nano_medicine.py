@@ -8,13 +8,34 @@ import os
 import json
 import sqlite3
 from dataclasses import dataclass, asdict, field
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple, Optional
 from enum import Enum
-import uuid
+import secrets
 import argparse
+import bisect
 import math
 
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode()
+    _json_loads = orjson.loads
+except ImportError:  # orjson is optional; fall back to stdlib json
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 # Database setup
 DB_PATH = os.path.expanduser("~/.blackroad/nanomed.db")
 
@@ -48,7 +69,130 @@ class Material(Enum):
     SILICA = "silica"
     LIPID = "lipid"
 
-@dataclass
+# Per-material lookup tables, hoisted so they are built once at import
+# rather than on every call
+_CHARGE_MAP = {
+    "lipid": -10,
+    "plga": -15,
+    "pla": -12,
+    "chitosan": 25,
+    "gold": -8,
+    "iron_oxide": -20,
+    "silica": -25
+}
+
+_MATERIAL_ABS = {
+    "lipid": 0.95,
+    "plga": 0.85,
+    "pla": 0.80,
+    "chitosan": 0.70,
+    "gold": 0.50,
+    "iron_oxide": 0.60,
+    "silica": 0.40
+}
+
+_MATERIAL_TOX = {
+    "lipid": 90,
+    "plga": 85,
+    "pla": 85,
+    "chitosan": 80,
+    "gold": 75,
+    "iron_oxide": 70,
+    "silica": 65
+}
+
+# Size-dependent clearance: half-life (hours) for diameters below 50, 100,
+# 200 nm and above
+_DIA_THRESHOLDS = (50, 100, 200)
+_T_HALF_TABLE = (0.5, 2.0, 6.0, 12.0)
+
+# Array forms for the batch PK path, plus a small-int encoding of materials
+# (last LUT slot holds the default for unknown codes, reached via index -1)
+_DIA_THRESHOLDS_ARR = np.array(_DIA_THRESHOLDS, dtype=np.float32)
+_T_HALF_ARR = np.array(_T_HALF_TABLE, dtype=np.float32)
+_MATERIAL_CODE = {m.value: i for i, m in enumerate(Material)}
+_ABS_LUT = np.array([_MATERIAL_ABS[m.value] for m in Material] + [0.75], dtype=np.float32)
+
+# Toxicity size penalties: undersized (<10, <30 nm) and oversized
+# (>300, >500 nm) particles score worse
+_SIZE_PEN_LOW_THRESHOLDS = (10, 30)
+_SIZE_PEN_LOW = (30, 15, 0)
+_SIZE_PEN_HIGH_THRESHOLDS = (300, 500)
+_SIZE_PEN_HIGH = (0, 15, 30)
+
+# Organ-specific formulation recommendations, keyed by target tissue
+_FORMULATION_TABLE = {
+    "lung": {
+        "diameter_nm": 50,
+        "type": "polymeric",
+        "material": "plga",
+        "targeting_ligand": "folate",
+        "charge_mv": -15,
+        "route": "inhalation"
+    },
+    "tumor": {
+        "diameter_nm": 100,
+        "type": "liposome",
+        "material": "lipid",
+        "targeting_ligand": "rgd_peptide",
+        "charge_mv": -20,
+        "route": "iv"
+    },
+    "brain": {
+        "diameter_nm": 80,
+        "type": "polymeric",
+        "material": "pla",
+        "targeting_ligand": "transferrin",
+        "charge_mv": 15,
+        "route": "iv"
+    },
+    "liver": {
+        "diameter_nm": 150,
+        "type": "dendrimer",
+        "material": "chitosan",
+        "targeting_ligand": "galactose",
+        "charge_mv": 25,
+        "route": "iv"
+    }
+}
+
+# Default systemic delivery
+_DEFAULT_FORMULATION = {
+    "diameter_nm": 100,
+    "type": "liposome",
+    "material": "lipid",
+    "targeting_ligand": "peg",
+    "charge_mv": -10,
+    "route": "iv"
+}
+
+
+# SQL statements as module constants: passing the same string object each
+# call lets sqlite3's internal statement cache reuse the prepared statement
+_SQL_INSERT_NP = 'INSERT INTO nanoparticles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+_SQL_SELECT_NP_LIGAND = 'SELECT targeting_ligand FROM nanoparticles WHERE id = ?'
+_SQL_SELECT_NP_EXISTS = 'SELECT 1 FROM nanoparticles WHERE id = ?'
+_SQL_SELECT_NP_PK = 'SELECT diameter_nm, material FROM nanoparticles WHERE id = ?'
+_SQL_SELECT_NP_TOX = 'SELECT diameter_nm, surface_charge_mv, material FROM nanoparticles WHERE id = ?'
+_SQL_INSERT_BIODIST = ('INSERT INTO biodistribution (nanoparticle_id, tissue, concentration_ug_ml, timestamp) '
+                       'VALUES (?, ?, ?, ?)')
+_SQL_INSERT_TX = ('INSERT INTO treatments '
+                  '(id, patient_id, nanoparticle_id, dose_mg_kg, route, frequency, duration_days, '
+                  'status, efficacy_pct, side_effects, created_at, updated_at) '
+                  'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)')
+_SQL_UPDATE_TX = ('UPDATE treatments SET efficacy_pct = ?, side_effects = ?, status = ?, updated_at = ? '
+                  'WHERE id = ?')
+_SQL_SELECT_TX = 'SELECT * FROM treatments WHERE 1=1'
+
+
+@njit(cache=True)
+def _pk_kernel(diameter, absorption, t_half, dose_mg):
+    """Numeric PK core: returns (cmax, tmax, auc) for one particle."""
+    ke = 0.693 / t_half
+    cmax = dose_mg * absorption / (diameter / 100.0)
+    return cmax, t_half * 0.3, cmax / ke
+
+@dataclass(slots=True)
 class Nanoparticle:
     id: str
     name: str
@@ -61,7 +205,7 @@ class Nanoparticle:
     material: str
     created_at: str
 
-@dataclass
+@dataclass(slots=True)
 class TreatmentPlan:
     id: str
     patient_id: str
@@ -74,17 +218,77 @@ class TreatmentPlan:
     efficacy_pct: float
     side_effects: List[str] = field(default_factory=list)
 
+class TreatmentPlanNT(NamedTuple):
+    """Immutable TreatmentPlan counterpart for read-heavy bulk queries.
+
+    Tuple construction is C-level, so materializing thousands of rows is
+    much cheaper than running the dataclass __init__ per row.
+    """
+    id: str
+    patient_id: str
+    nanoparticle_id: str
+    dose_mg_kg: float
+    route: str
+    frequency: str
+    duration_days: int
+    status: str
+    efficacy_pct: float
+    side_effects: List[str]
+
+class PKResult(NamedTuple):
+    """Raw pharmacokinetic parameters; round only at display time."""
+    cmax_ug_ml: float
+    tmax_h: float
+    auc_ug_h_ml: float
+    half_life_h: float
+    clearance_route: str
+
 class NanoMedicineSystem:
+    # Baseline tissue distribution weights (percent of injected dose)
+    _tissue_keys = ("liver", "spleen", "kidney", "bone_marrow", "tumor", "other")
+    _tissue_weights = np.array([35, 25, 15, 10, 5, 10], dtype=np.float32)
+
     def __init__(self):
         self.db_path = DB_PATH
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        # Single long-lived connection: avoids per-call connect/close overhead
+        # and keeps the SQLite page cache warm across queries. Default
+        # (deferred) isolation so 'with self._conn:' blocks delimit real
+        # transactions; autocommit would make them no-ops.
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript('''
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-20000;
+        ''')
         self._init_db()
-    
+
+        # SoA cache of nanoparticle numerics: contiguous arrays grown by
+        # doubling, so batch analytics never touch SQLite or boxed floats
+        self._np_count = 0
+        self._np_ids = []
+        self._np_diameter = np.empty(16, dtype=np.float32)
+        self._np_charge = np.empty(16, dtype=np.float32)
+        self._np_encapsulation = np.empty(16, dtype=np.float32)
+        self._np_material_code = np.empty(16, dtype=np.int8)
+        self._load_np_cache()
+
+    def close(self):
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def __del__(self):
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
     def _init_db(self):
         """Initialize SQLite database with required tables."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
+        c = self._conn.cursor()
+
         c.execute('''CREATE TABLE IF NOT EXISTS nanoparticles (
             id TEXT PRIMARY KEY,
             name TEXT NOT NULL,
@@ -122,34 +326,71 @@ class NanoMedicineSystem:
             timestamp TEXT NOT NULL,
             FOREIGN KEY(nanoparticle_id) REFERENCES nanoparticles(id)
         )''')
-        
-        conn.commit()
-        conn.close()
-    
+
+        # Indexes on the columns the lookup paths filter by; nanoparticles.id
+        # is the primary key and needs no extra index
+        c.execute('CREATE INDEX IF NOT EXISTS idx_tx_patient ON treatments(patient_id)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_tx_status ON treatments(status)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_biodist_np ON biodistribution(nanoparticle_id)')
+
+        self._conn.commit()
+
+    def _load_np_cache(self):
+        """Populate the SoA cache from nanoparticles already on disk."""
+        c = self._conn.execute(
+            'SELECT id, diameter_nm, surface_charge_mv, encapsulation_pct, material FROM nanoparticles')
+        for row in c:
+            self._np_cache_append(row['id'], row['diameter_nm'], row['surface_charge_mv'],
+                                  row['encapsulation_pct'], row['material'])
+
+    def _np_cache_append(self, np_id, diameter_nm, surface_charge_mv, encapsulation_pct, material):
+        n = self._np_count
+        if n == len(self._np_diameter):
+            self._np_diameter = np.resize(self._np_diameter, n * 2)
+            self._np_charge = np.resize(self._np_charge, n * 2)
+            self._np_encapsulation = np.resize(self._np_encapsulation, n * 2)
+            self._np_material_code = np.resize(self._np_material_code, n * 2)
+        self._np_ids.append(np_id)
+        self._np_diameter[n] = diameter_nm
+        self._np_charge[n] = surface_charge_mv
+        self._np_encapsulation[n] = encapsulation_pct
+        self._np_material_code[n] = _MATERIAL_CODE.get(material, -1)
+        self._np_count = n + 1
+
+    def nanoparticle_arrays(self) -> Dict:
+        """SoA view of cached nanoparticle numerics for batch analytics.
+
+        The arrays are trimmed views over the internal buffers; treat them
+        as read-only.
+        """
+        n = self._np_count
+        return {
+            "ids": self._np_ids,
+            "diameter_nm": self._np_diameter[:n],
+            "surface_charge_mv": self._np_charge[:n],
+            "encapsulation_pct": self._np_encapsulation[:n],
+            "material_code": self._np_material_code[:n]
+        }
+
     def design_nanoparticle(self, name: str, type_str: str, diameter_nm: float, 
                            drug_payload: str, material: str, targeting_ligand: str = "",
                            encapsulation_pct: float = 85) -> Nanoparticle:
         """Design a new nanoparticle formulation."""
-        if type_str not in [t.value for t in NanoparticleType]:
-            raise ValueError(f"Invalid type. Must be one of {[t.value for t in NanoparticleType]}")
-        if material not in [m.value for m in Material]:
-            raise ValueError(f"Invalid material. Must be one of {[m.value for m in Material]}")
+        try:
+            NanoparticleType(type_str)
+        except ValueError:
+            raise ValueError(f"Invalid type. Must be one of {[t.value for t in NanoparticleType]}") from None
+        try:
+            Material(material)
+        except ValueError:
+            raise ValueError(f"Invalid material. Must be one of {[m.value for m in Material]}") from None
         
         # Surface charge based on material
-        charge_map = {
-            "lipid": -10,
-            "plga": -15,
-            "pla": -12,
-            "chitosan": 25,
-            "gold": -8,
-            "iron_oxide": -20,
-            "silica": -25
-        }
-        
-        surface_charge = charge_map.get(material, -10)
-        np_id = f"NP_{uuid.uuid4().hex[:8].upper()}"
+        surface_charge = _CHARGE_MAP.get(material, -10)
+        np_id = f"NP_{secrets.token_hex(4).upper()}"
+        now = datetime.now(timezone.utc).isoformat()
         
-        np = Nanoparticle(
+        particle = Nanoparticle(
             id=np_id,
             name=name,
             type=type_str,
@@ -159,74 +400,73 @@ class NanoMedicineSystem:
             encapsulation_pct=encapsulation_pct,
             targeting_ligand=targeting_ligand,
             material=material,
-            created_at=datetime.now().isoformat()
+            created_at=now
         )
         
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''INSERT INTO nanoparticles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                 tuple(asdict(np).values()))
-        conn.commit()
-        conn.close()
-        
-        return np
+        with self._conn:
+            self._conn.execute(_SQL_INSERT_NP,
+                              (particle.id, particle.name, particle.type, particle.diameter_nm,
+                               particle.surface_charge_mv, particle.drug_payload,
+                               particle.encapsulation_pct, particle.targeting_ligand,
+                               particle.material, particle.created_at))
+
+        self._np_cache_append(particle.id, particle.diameter_nm, particle.surface_charge_mv,
+                              particle.encapsulation_pct, particle.material)
+
+        return particle
     
     def simulate_delivery(self, nanoparticle_id: str, target_tissue: str, dose_mg: float) -> Dict:
         """Simulate nanoparticle biodistribution."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('SELECT * FROM nanoparticles WHERE id = ?', (nanoparticle_id,))
-        np_row = c.fetchone()
-        conn.close()
-        
-        if not np_row:
-            raise ValueError(f"Nanoparticle {nanoparticle_id} not found")
-        
-        # Simulate tissue distribution based on targeting
-        tissue_distribution = {
-            "liver": 35,
-            "spleen": 25,
-            "kidney": 15,
-            "bone_marrow": 10,
-            "tumor": 5,
-            "other": 10
-        }
-        
-        # If targeting ligand present, increase target tissue
-        if np_row[7]:  # targeting_ligand
-            tissue_distribution[target_tissue] = min(70, tissue_distribution.get(target_tissue, 10) + 40)
-        
-        # Normalize to 100%
-        total = sum(tissue_distribution.values())
-        biodist = {k: (v / total) * dose_mg * 1000 for k, v in tissue_distribution.items()}
-        
-        # Store in db
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        for tissue, conc in biodist.items():
-            c.execute('''INSERT INTO biodistribution (nanoparticle_id, tissue, concentration_ug_ml, timestamp)
-                        VALUES (?, ?, ?, ?)''',
-                     (nanoparticle_id, tissue, conc, datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
-        
+        # The connection context manager wraps the lookup and the inserts in
+        # one deferred transaction: the stored rows stay consistent with the
+        # particle that was read, and an exception rolls everything back
+        with self._conn:
+            np_row = self._conn.execute(_SQL_SELECT_NP_LIGAND, (nanoparticle_id,)).fetchone()
+
+            if not np_row:
+                raise ValueError(f"Nanoparticle {nanoparticle_id} not found")
+            targeting_ligand = np_row[0]
+
+            # Simulate tissue distribution based on targeting
+            keys = self._tissue_keys
+            weights = self._tissue_weights.copy()
+
+            # If targeting ligand present, increase target tissue
+            if targeting_ligand:
+                if target_tissue in keys:
+                    idx = keys.index(target_tissue)
+                    weights[idx] = min(70, weights[idx] + 40)
+                else:
+                    keys = keys + (target_tissue,)
+                    weights = np.append(weights, min(70, 10 + 40))
+
+            # Normalize to 100% in one vectorized pass
+            biodist_arr = weights * (dose_mg * 1000.0 / weights.sum())
+            biodist = dict(zip(keys, biodist_arr.tolist()))
+
+            # Batched insert: one statement for all tissues, committed
+            # together by the enclosing transaction
+            ts = datetime.now(timezone.utc).isoformat()
+            rows = [(nanoparticle_id, tissue, conc, ts) for tissue, conc in biodist.items()]
+            self._conn.executemany(_SQL_INSERT_BIODIST, rows)
+
         return biodist
     
     def create_treatment(self, patient_id: str, nanoparticle_id: str, dose_mg_kg: float,
                         route: str, duration_days: int, frequency: str = "daily") -> TreatmentPlan:
         """Create a treatment plan."""
-        if route not in [r.value for r in DeliveryRoute]:
-            raise ValueError(f"Invalid route. Must be one of {[r.value for r in DeliveryRoute]}")
+        try:
+            DeliveryRoute(route)
+        except ValueError:
+            raise ValueError(f"Invalid route. Must be one of {[r.value for r in DeliveryRoute]}") from None
         
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('SELECT * FROM nanoparticles WHERE id = ?', (nanoparticle_id,))
+        c = self._conn.cursor()
+        c.execute(_SQL_SELECT_NP_EXISTS, (nanoparticle_id,))
         if not c.fetchone():
-            conn.close()
             raise ValueError(f"Nanoparticle {nanoparticle_id} not found")
         
-        treatment_id = f"TX_{uuid.uuid4().hex[:8].upper()}"
-        now = datetime.now().isoformat()
+        treatment_id = f"TX_{secrets.token_hex(4).upper()}"
+        now = datetime.now(timezone.utc).isoformat()
         
         treatment = TreatmentPlan(
             id=treatment_id,
@@ -240,134 +480,122 @@ class NanoMedicineSystem:
             efficacy_pct=0
         )
         
-        c.execute('''INSERT INTO treatments 
-                    (id, patient_id, nanoparticle_id, dose_mg_kg, route, frequency, duration_days, status, efficacy_pct, side_effects, created_at, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+        with self._conn:
+            self._conn.execute(_SQL_INSERT_TX,
                  (treatment.id, treatment.patient_id, treatment.nanoparticle_id, treatment.dose_mg_kg,
                   treatment.route, treatment.frequency, treatment.duration_days, treatment.status,
-                  treatment.efficacy_pct, json.dumps(treatment.side_effects), now, now))
-        conn.commit()
-        conn.close()
-        
+                  treatment.efficacy_pct, _json_dumps(treatment.side_effects), now, now))
+
         return treatment
     
     def update_efficacy(self, treatment_id: str, efficacy_pct: float, side_effects: List[str] = None):
         """Update treatment efficacy and side effects."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
         side_effects = side_effects or []
-        c.execute('''UPDATE treatments SET efficacy_pct = ?, side_effects = ?, status = ?, updated_at = ?
-                    WHERE id = ?''',
-                 (efficacy_pct, json.dumps(side_effects), TreatmentStatus.ACTIVE.value, 
-                  datetime.now().isoformat(), treatment_id))
-        conn.commit()
-        conn.close()
+        with self._conn:
+            self._conn.execute(_SQL_UPDATE_TX,
+                 (efficacy_pct, _json_dumps(side_effects), TreatmentStatus.ACTIVE.value,
+                  datetime.now(timezone.utc).isoformat(), treatment_id))
     
-    def get_treatments(self, patient_id: Optional[str] = None, status: Optional[str] = None) -> List[TreatmentPlan]:
-        """Retrieve treatment plans."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        
-        query = 'SELECT * FROM treatments WHERE 1=1'
+    def _query_treatments(self, patient_id: Optional[str], status: Optional[str]) -> sqlite3.Cursor:
+        query = _SQL_SELECT_TX
         params = []
-        
+
         if patient_id:
             query += ' AND patient_id = ?'
             params.append(patient_id)
         if status:
             query += ' AND status = ?'
             params.append(status)
-        
-        c.execute(query, params)
-        rows = c.fetchall()
-        conn.close()
-        
-        treatments = []
-        for row in rows:
-            treatments.append(TreatmentPlan(
-                id=row[0], patient_id=row[1], nanoparticle_id=row[2],
-                dose_mg_kg=row[3], route=row[4], frequency=row[5],
-                duration_days=row[6], status=row[7], efficacy_pct=row[8],
-                side_effects=json.loads(row[9])
-            ))
-        return treatments
-    
-    def pharmacokinetics(self, nanoparticle_id: str, dose_mg: float) -> Dict:
+
+        return self._conn.execute(query, params)
+
+    def get_treatments(self, patient_id: Optional[str] = None, status: Optional[str] = None) -> List[TreatmentPlan]:
+        """Retrieve treatment plans."""
+        c = self._query_treatments(patient_id, status)
+        return [TreatmentPlan(
+            id=row['id'], patient_id=row['patient_id'], nanoparticle_id=row['nanoparticle_id'],
+            dose_mg_kg=row['dose_mg_kg'], route=row['route'], frequency=row['frequency'],
+            duration_days=row['duration_days'], status=row['status'], efficacy_pct=row['efficacy_pct'],
+            side_effects=_json_loads(row['side_effects'])
+        ) for row in c.fetchall()]
+
+    def get_treatments_fast(self, patient_id: Optional[str] = None,
+                            status: Optional[str] = None) -> List[TreatmentPlanNT]:
+        """Like get_treatments, but returns immutable TreatmentPlanNT rows.
+
+        Preferred for large result sets (dashboards, exports) where the
+        caller only reads the data.
+        """
+        c = self._query_treatments(patient_id, status)
+        return [TreatmentPlanNT._make((*row[:9], _json_loads(row[9])))
+                for row in c.fetchall()]
+
+    def pharmacokinetics(self, nanoparticle_id: str, dose_mg: float) -> PKResult:
         """Calculate pharmacokinetic parameters."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('SELECT * FROM nanoparticles WHERE id = ?', (nanoparticle_id,))
+        c = self._conn.cursor()
+        c.execute(_SQL_SELECT_NP_PK, (nanoparticle_id,))
         np_row = c.fetchone()
-        conn.close()
-        
+
         if not np_row:
             raise ValueError(f"Nanoparticle {nanoparticle_id} not found")
-        
+
         # Simplified PK modeling based on size and material
-        diameter = np_row[3]
-        material = np_row[8]
+        diameter, material = np_row
         
         # Size-dependent clearance
-        if diameter < 50:
-            t_half = 0.5  # hours, fast clearance
-        elif diameter < 100:
-            t_half = 2.0
-        elif diameter < 200:
-            t_half = 6.0
-        else:
-            t_half = 12.0
+        t_half = _T_HALF_TABLE[bisect.bisect_right(_DIA_THRESHOLDS, diameter)]
         
         # Material-dependent absorption
-        material_abs = {
-            "lipid": 0.95,
-            "plga": 0.85,
-            "pla": 0.80,
-            "chitosan": 0.70,
-            "gold": 0.50,
-            "iron_oxide": 0.60,
-            "silica": 0.40
-        }
-        
-        absorption = material_abs.get(material, 0.75)
+        absorption = _MATERIAL_ABS.get(material, 0.75)
         
         # PK calculations
-        cmax = dose_mg * absorption / (diameter / 100)  # μg/mL
-        tmax = t_half * 0.3  # hours, simplified
+        cmax, tmax, auc = _pk_kernel(diameter, absorption, t_half, dose_mg)
+
+        return PKResult(cmax, tmax, auc, t_half, material)
+    
+    def pharmacokinetics_batch(self, diameters, materials, doses) -> Dict:
+        """Vectorized PK over arrays of candidate particles.
+
+        ``materials`` may be material name strings or small-int codes from
+        ``_MATERIAL_CODE``; unknown materials get the default absorption.
+        Returns a dict of NumPy arrays aligned with the inputs.
+        """
+        diameters = np.asarray(diameters, dtype=np.float32)
+        doses = np.asarray(doses, dtype=np.float32)
+        codes = np.asarray([m if isinstance(m, (int, np.integer)) else _MATERIAL_CODE.get(m, -1)
+                            for m in materials], dtype=np.int8)
+
+        absorption = _ABS_LUT[codes]
+        t_half = _T_HALF_ARR[np.searchsorted(_DIA_THRESHOLDS_ARR, diameters, side='right')]
+
+        cmax = doses * absorption / (diameters / 100.0)
         ke = 0.693 / t_half
-        auc = cmax / ke
-        
         return {
-            "cmax_ug_ml": round(cmax, 2),
-            "tmax_h": round(tmax, 2),
-            "auc_ug_h_ml": round(auc, 2),
-            "half_life_h": round(t_half, 2),
-            "clearance_route": material
+            "cmax_ug_ml": cmax,
+            "tmax_h": t_half * 0.3,
+            "auc_ug_h_ml": cmax / ke,
+            "half_life_h": t_half
         }
-    
+
     def toxicity_assessment(self, nanoparticle_id: str) -> Dict:
         """Assess nanoparticle toxicity risk."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('SELECT * FROM nanoparticles WHERE id = ?', (nanoparticle_id,))
+        c = self._conn.cursor()
+        c.execute(_SQL_SELECT_NP_TOX, (nanoparticle_id,))
         np_row = c.fetchone()
-        conn.close()
-        
+
         if not np_row:
             raise ValueError(f"Nanoparticle {nanoparticle_id} not found")
-        
-        diameter = np_row[3]
-        charge = abs(np_row[4])
-        material = np_row[8]
+
+        diameter, surface_charge, material = np_row
+        charge = abs(surface_charge)
         
         # Safety scoring (0-100, higher is safer)
         score = 100
         
-        # Size considerations (optimal 50-150nm)
-        if diameter < 10 or diameter > 500:
-            score -= 30
-        elif diameter < 30 or diameter > 300:
-            score -= 15
+        # Size considerations (optimal 50-150nm): bisect the undersized and
+        # oversized penalty tables; at most one of the two is nonzero
+        score -= max(_SIZE_PEN_LOW[bisect.bisect_right(_SIZE_PEN_LOW_THRESHOLDS, diameter)],
+                     _SIZE_PEN_HIGH[bisect.bisect_left(_SIZE_PEN_HIGH_THRESHOLDS, diameter)])
         
         # Charge considerations (±20 is safer, neutral is risky for targeting)
         if abs(charge) < 5:
@@ -376,17 +604,7 @@ class NanoMedicineSystem:
             score -= 15
         
         # Material toxicity
-        material_toxicity = {
-            "lipid": 90,
-            "plga": 85,
-            "pla": 85,
-            "chitosan": 80,
-            "gold": 75,
-            "iron_oxide": 70,
-            "silica": 65
-        }
-        
-        score = min(score, material_toxicity.get(material, 60))
+        score = min(score, _MATERIAL_TOX.get(material, 60))
         
         return {
             "safety_score": score,
@@ -398,59 +616,11 @@ class NanoMedicineSystem:
     
     def optimize_formulation(self, drug_payload: str, target_tissue: str) -> Dict:
         """Suggest optimal nanoparticle parameters for target."""
-        suggestions = {}
-        
-        # Organ-specific recommendations
-        if target_tissue == "lung":
-            suggestions = {
-                "diameter_nm": 50,
-                "type": "polymeric",
-                "material": "plga",
-                "targeting_ligand": "folate",
-                "charge_mv": -15,
-                "route": "inhalation"
-            }
-        elif target_tissue == "tumor":
-            suggestions = {
-                "diameter_nm": 100,
-                "type": "liposome",
-                "material": "lipid",
-                "targeting_ligand": "rgd_peptide",
-                "charge_mv": -20,
-                "route": "iv"
-            }
-        elif target_tissue == "brain":
-            suggestions = {
-                "diameter_nm": 80,
-                "type": "polymeric",
-                "material": "pla",
-                "targeting_ligand": "transferrin",
-                "charge_mv": 15,
-                "route": "iv"
-            }
-        elif target_tissue == "liver":
-            suggestions = {
-                "diameter_nm": 150,
-                "type": "dendrimer",
-                "material": "chitosan",
-                "targeting_ligand": "galactose",
-                "charge_mv": 25,
-                "route": "iv"
-            }
-        else:
-            # Default systemic delivery
-            suggestions = {
-                "diameter_nm": 100,
-                "type": "liposome",
-                "material": "lipid",
-                "targeting_ligand": "peg",
-                "charge_mv": -10,
-                "route": "iv"
-            }
-        
+        # Copy so callers can mutate their result without touching the table
+        suggestions = dict(_FORMULATION_TABLE.get(target_tissue, _DEFAULT_FORMULATION))
         suggestions["drug_payload"] = drug_payload
         suggestions["target_tissue"] = target_tissue
-        
+
         return suggestions
 
 
@@ -483,10 +653,10 @@ def main():
     system = NanoMedicineSystem()
     
     if args.command == "design":
-        np = system.design_nanoparticle(args.name, args.type, args.diameter, args.drug, 
-                                       args.material, args.ligand, args.encapsulation)
-        print(f"✓ Designed: {np.id} - {np.name}")
-        print(json.dumps(asdict(np), indent=2, default=str))
+        particle = system.design_nanoparticle(args.name, args.type, args.diameter, args.drug,
+                                             args.material, args.ligand, args.encapsulation)
+        print(f"✓ Designed: {particle.id} - {particle.name}")
+        print(json.dumps(asdict(particle), indent=2, default=str))
     
     elif args.command == "simulate":
         biodist = system.simulate_delivery(args.np_id, args.tissue, args.dose)